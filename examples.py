@@ -4,6 +4,7 @@ This module contains various examples showing different ways to use the MusicGen
 """
 
 from music_generator import MusicGenerator
+from visualization import ThumbnailRenderer
 import os
 import time
 
@@ -164,6 +165,7 @@ def batch_generation_example():
     
     print(f"Generating {num_variations} variations of: '{prompt}'")
     
+    variations = {}
     for i in range(num_variations):
         print(f"\n🔄 Generating variation {i+1}/{num_variations}...")
         
@@ -171,10 +173,52 @@ def batch_generation_example():
             audio_data, sample_rate = generator.generate_music(prompt)
             filename = os.path.join(batch_folder, f"variation_{i+1}.wav")
             generator.save_audio(audio_data, filename)
+            variations[filename] = audio_data
             print(f"✅ Saved variation {i+1}: {filename}")
             
         except Exception as e:
             print(f"❌ Error generating variation {i+1}: {e}")
+            
+    # Render waveform/spectrogram thumbnails for all variations in one pass
+    if variations:
+        renderer = ThumbnailRenderer()
+        try:
+            thumbnails = renderer.render_batch(list(variations.values()), generator.sampling_rate)
+        finally:
+            renderer.executor.shutdown()
+            
+        for filename, png in zip(variations, thumbnails):
+            thumbnail_file = os.path.splitext(filename)[0] + ".png"
+            with open(thumbnail_file, "wb") as fh:
+                fh.write(png)
+            print(f"🖼️ Thumbnail saved: {thumbnail_file}")
+
+
+def melody_variations_example(melody_file="melody.wav"):
+    """Apply several style prompts to one reference melody."""
+    print("\n=== MELODY VARIATIONS EXAMPLE ===")
+    
+    generator = MusicGenerator(model_name='facebook/musicgen-melody', duration=8)
+    generator.load_model()
+    generator.configure_model()
+    
+    styles = [
+        "80s synthwave with arpeggiated synths",
+        "acoustic folk with guitar and harmonica",
+        "orchestral classical music with strings",
+        "smooth jazz with saxophone and piano"
+    ]
+    
+    melody_folder = "melody_variations"
+    os.makedirs(melody_folder, exist_ok=True)
+    
+    # Melody features are computed once and reused for every style
+    audio_list, sample_rate = generator.generate_with_melody(styles, melody_file)
+    
+    for i, (style, audio_data) in enumerate(zip(styles, audio_list)):
+        filename = os.path.join(melody_folder, f"melody_style_{i+1}.wav")
+        generator.save_audio(audio_data, filename)
+        print(f"✅ Saved {style}: {filename}")
 
 
 def run_all_examples():
@@ -226,9 +270,11 @@ if __name__ == "__main__":
             prompt_refinement_example()
         elif example_name == "batch":
             batch_generation_example()
+        elif example_name == "melody":
+            melody_variations_example(*sys.argv[2:3])
         elif example_name == "all":
             run_all_examples()
         else:
-            print("Available examples: basic, multiple, durations, genres, refinement, batch, all")
+            print("Available examples: basic, multiple, durations, genres, refinement, batch, melody, all")
     else:
         run_all_examples()
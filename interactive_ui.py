@@ -3,26 +3,35 @@ Interactive UI for Music Generation
 This module provides a Jupyter notebook widget interface for music generation.
 """
 
-from ipywidgets import Textarea, Button, VBox, HBox, Output
+from ipywidgets import Textarea, Button, Dropdown, Image, VBox, HBox, Output
 from IPython.display import display, Audio, clear_output
 from music_generator import MusicGenerator
+from session_history import SessionHistory
+from visualization import ThumbnailRenderer
 import datetime
 
 
 class MusicGeneratorUI:
     """Interactive UI for music generation using ipywidgets."""
     
-    def __init__(self, model_name='facebook/musicgen-small', duration=8):
+    def __init__(self, model_name='facebook/musicgen-small', duration=8,
+                 history_memory_mb=256, history_spill_dir=None):
         """
         Initialize the UI.
         
         Args:
             model_name (str): The pretrained model to use
             duration (int): Duration of generated music in seconds
+            history_memory_mb (float): RAM budget for the session history
+            history_spill_dir (str, optional): Directory for takes evicted
+                from RAM. Uses a temporary directory if None.
         """
         self.generator = MusicGenerator(model_name, duration)
+        self.history = SessionHistory(history_memory_mb, history_spill_dir)
+        self.thumbnails = ThumbnailRenderer()
         self.setup_widgets()
         self.generated_count = 0
+        self.preview = None
         
     def setup_widgets(self):
         """Setup all UI widgets."""
@@ -43,14 +52,47 @@ class MusicGeneratorUI:
             layout={'width': '150px'}
         )
         
+        # Preview button
+        self.preview_button = Button(
+            description="Preview",
+            button_style='info',
+            layout={'width': '150px'}
+        )
+        
+        # Render full button (enabled once a preview exists)
+        self.render_full_button = Button(
+            description="Render Full",
+            button_style='success',
+            disabled=True,
+            layout={'width': '150px'}
+        )
+        
+        # Session history selector and actions
+        self.history_select = Dropdown(
+            options=[],
+            description='History:',
+            layout={'width': '500px'}
+        )
+        self.replay_button = Button(description="Replay", layout={'width': '150px'})
+        self.compare_button = Button(description="Compare with Latest", layout={'width': '150px'})
+        self.export_button = Button(description="Export", layout={'width': '150px'})
+        
         # Status output
         self.status_output = Output()
         
         # Audio output
         self.audio_output = Output()
         
-        # Connect button to function
+        # History playback output
+        self.history_output = Output()
+        
+        # Connect buttons to functions
         self.generate_button.on_click(self.generate_music)
+        self.preview_button.on_click(self.generate_preview)
+        self.render_full_button.on_click(self.render_full)
+        self.replay_button.on_click(self.replay_take)
+        self.compare_button.on_click(self.compare_take)
+        self.export_button.on_click(self.export_take)
         
     def initialize_model(self):
         """Initialize the music generation model."""
@@ -81,40 +123,135 @@ class MusicGeneratorUI:
         prompt = self.description.value.strip()
         
         if not prompt:
-            with self.status_output:
-                clear_output(wait=True)
-                print("⚠️ Please enter a music prompt!")
+            self._show_status("⚠️ Please enter a music prompt!")
+            return
+            
+        self.preview = None
+        self._run_generation(
+            self.generate_button,
+            "Generate Music",
+            f"🎵 Generating music for: '{prompt}'",
+            prompt,
+            lambda: self.generator.generate_music(prompt),
+        )
+        
+    def generate_preview(self, button):
+        """
+        Generate a short preview snippet for quick auditioning.
+        
+        Args:
+            button: The button widget that triggered this function
+        """
+        prompt = self.description.value.strip()
+        
+        if not prompt:
+            self._show_status("⚠️ Please enter a music prompt!")
+            return
+            
+        def generate():
+            audio_data, sampling_rate = self.generator.generate_preview(prompt)
+            self.preview = (prompt, audio_data)
+            return audio_data, sampling_rate
+            
+        self._run_generation(
+            self.preview_button,
+            "Preview",
+            f"👂 Generating preview for: '{prompt}'",
+            prompt,
+            generate,
+            save=False,
+        )
+        
+    def render_full(self, button):
+        """
+        Render the full clip by continuing from the current preview.
+        
+        Args:
+            button: The button widget that triggered this function
+        """
+        if self.preview is None:
+            self._show_status("⚠️ Generate a preview first!")
             return
             
-        # Disable button during generation
-        self.generate_button.disabled = True
-        self.generate_button.description = "Generating..."
+        prompt, preview_audio = self.preview
+        
+        def generate():
+            result = self.generator.render_full(preview_audio, prompt)
+            self.preview = None
+            return result
+            
+        self._run_generation(
+            self.render_full_button,
+            "Render Full",
+            f"🎵 Rendering full clip for: '{prompt}'",
+            prompt,
+            generate,
+        )
+        
+    def _show_status(self, message):
+        """Replace the status output with a message."""
+        with self.status_output:
+            clear_output(wait=True)
+            print(message)
+            
+    def _run_generation(self, button, label, message, prompt, generate, save=True):
+        """
+        Run a generation call, display the result and optionally save it.
+        
+        The result is also added to the session history.
+        
+        Args:
+            button: The button to disable while generating
+            label (str): Button description to restore afterwards
+            message (str): Status message shown while generating
+            prompt (str): Prompt recorded with the take in the history
+            generate: Callable returning (audio_data, sampling_rate)
+            save (bool): Whether to save the result to a WAV file
+        """
+        # Disable buttons during generation
+        buttons = [self.generate_button, self.preview_button, self.render_full_button]
+        for widget in buttons:
+            widget.disabled = True
+        button.description = "Generating..."
         
         with self.status_output:
             clear_output(wait=True)
-            print(f"🎵 Generating music for: '{prompt}'")
+            print(message)
             print("This may take a few moments...")
             
         try:
-            # Generate music
-            audio_data, sampling_rate = self.generator.generate_music(prompt)
+            audio_data, sampling_rate = generate()
             
             # Display audio player
             with self.audio_output:
                 clear_output(wait=True)
                 audio_widget = Audio(audio_data, rate=sampling_rate)
                 display(audio_widget)
+                display(self._thumbnail_widget(audio_data, sampling_rate))
+                
+            # Keep a compact copy for replay and comparison
+            take_label = 'full' if save else 'preview'
+            self.history.add(audio_data, sampling_rate, prompt, take_label)
+            self._refresh_history()
                 
-            # Save audio file
-            self.generated_count += 1
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"generated_music_{self.generated_count}_{timestamp}.wav"
-            self.generator.save_audio(audio_data, filename)
-            
             with self.status_output:
                 clear_output(wait=True)
-                print(f"✅ Music generated successfully!")
-                print(f"💾 Saved as: {filename}")
+                
+            if save:
+                # Save audio file
+                self.generated_count += 1
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"generated_music_{self.generated_count}_{timestamp}.wav"
+                self.generator.save_audio(audio_data, filename)
+                
+                with self.status_output:
+                    print(f"✅ Music generated successfully!")
+                    print(f"💾 Saved as: {filename}")
+            else:
+                with self.status_output:
+                    print("✅ Preview ready! Click 'Render Full' to continue it.")
+                    
+            with self.status_output:
                 print(f"⏱️ Duration: {len(audio_data[0]) / sampling_rate:.1f} seconds")
                 
         except Exception as e:
@@ -123,9 +260,111 @@ class MusicGeneratorUI:
                 print(f"❌ Error generating music: {str(e)}")
                 
         finally:
-            # Re-enable button
+            # Re-enable buttons
             self.generate_button.disabled = False
-            self.generate_button.description = "Generate Music"
+            self.preview_button.disabled = False
+            self.render_full_button.disabled = self.preview is None
+            button.description = label
+            
+    def replay_take(self, button):
+        """
+        Replay the take selected in the history.
+        
+        Args:
+            button: The button widget that triggered this function
+        """
+        take_id = self.history_select.value
+        if take_id is None:
+            self._show_status("⚠️ No takes in the session history yet!")
+            return
+            
+        audio_data, sampling_rate = self.history.get(take_id)
+        with self.history_output:
+            clear_output(wait=True)
+            print(self.history.entries[take_id].describe())
+            display(Audio(audio_data, rate=sampling_rate))
+            display(self._thumbnail_widget(audio_data, sampling_rate))
+            
+    def compare_take(self, button):
+        """
+        Show the selected take next to the latest take.
+        
+        If the latest take is selected, it is compared with the one before.
+        
+        Args:
+            button: The button widget that triggered this function
+        """
+        take_id = self.history_select.value
+        if take_id is None:
+            self._show_status("⚠️ No takes in the session history yet!")
+            return
+            
+        take_ids = list(self.history.entries)
+        if len(take_ids) < 2:
+            self._show_status("⚠️ Generate another take to compare with!")
+            return
+            
+        latest_id = take_ids[-1] if take_id != take_ids[-1] else take_ids[-2]
+        with self.history_output:
+            clear_output(wait=True)
+            for compare_id in (take_id, latest_id):
+                audio_data, sampling_rate = self.history.get(compare_id)
+                print(self.history.entries[compare_id].describe())
+                display(Audio(audio_data, rate=sampling_rate))
+                display(self._thumbnail_widget(audio_data, sampling_rate))
+                
+    def export_take(self, button):
+        """
+        Export the take selected in the history to a WAV file.
+        
+        Args:
+            button: The button widget that triggered this function
+        """
+        take_id = self.history_select.value
+        if take_id is None:
+            self._show_status("⚠️ No takes in the session history yet!")
+            return
+            
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"take_{take_id}_{timestamp}.wav"
+        try:
+            self.history.export(take_id, filename)
+            self._show_status(f"💾 Take #{take_id} exported as: {filename}")
+        except Exception as e:
+            self._show_status(f"❌ Error exporting take: {str(e)}")
+            
+    def _thumbnail_widget(self, audio_data, sampling_rate):
+        """
+        Create an image widget that is filled once the thumbnail is rendered.
+        
+        Rendering runs on a background thread; thumbnails for clips already
+        seen (e.g. replayed history takes) come straight from the cache.
+        
+        Args:
+            audio_data: Audio data as numpy array
+            sampling_rate (int): Sampling rate of the audio
+            
+        Returns:
+            ipywidgets.Image widget
+        """
+        image = Image(format='png')
+        
+        def show(future):
+            error = future.exception()
+            if error is None:
+                image.value = future.result()
+            else:
+                # Runs on the render thread, so append instead of capturing
+                self.status_output.append_stdout(f"❌ Error rendering thumbnail: {error}\n")
+                
+        self.thumbnails.submit(audio_data, sampling_rate).add_done_callback(show)
+        return image
+        
+    def _refresh_history(self):
+        """Update the history selector with the current takes."""
+        self.history_select.options = self.history.describe()
+        if self.history.entries:
+            self.history_select.value = next(reversed(self.history.entries))
             
     def display(self):
         """Display the complete UI."""
@@ -135,9 +374,12 @@ class MusicGeneratorUI:
         # Create layout
         ui = VBox([
             self.description,
-            HBox([self.generate_button]),
+            HBox([self.preview_button, self.render_full_button, self.generate_button]),
             self.status_output,
-            self.audio_output
+            self.audio_output,
+            self.history_select,
+            HBox([self.replay_button, self.compare_button, self.export_button]),
+            self.history_output
         ])
         
         display(ui)
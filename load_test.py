@@ -0,0 +1,418 @@
+"""
+Load Testing and Traffic Replay for Music Generation
+This module replays recorded or synthetic request traces against a music
+generator and reports latency, throughput, queue time and error rates.
+"""
+
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+
+DEFAULT_PROMPTS = [
+    "classic rock song",
+    "upbeat electronic dance music",
+    "slow jazz piano ballad",
+    "acoustic guitar folk song",
+    "ambient atmospheric soundscape",
+]
+
+DEFAULT_DURATIONS = [5, 8, 10, 15]
+
+
+class StubMusicGenerator:
+    """Offline stand-in for MusicGenerator with a simple latency model."""
+
+    def __init__(self, duration=8, sampling_rate=32000, base_latency=0.05,
+                 seconds_per_audio_second=0.05, jitter=0.2, failure_rate=0.0,
+                 seed=None):
+        """
+        Initialize the stub.
+
+        Args:
+            duration (int): Duration of generated music in seconds
+            sampling_rate (int): Sampling rate of the returned silence
+            base_latency (float): Fixed cost of each call in seconds
+            seconds_per_audio_second (float): Extra cost per second of audio
+            jitter (float): Relative random variation of the latency
+            failure_rate (float): Probability that a call raises an error
+            seed (int, optional): Seed for the latency and failure randomness
+        """
+        self.duration = duration
+        self.configured_duration = duration
+        self.sampling_rate = sampling_rate
+        self.base_latency = base_latency
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+
+    def load_model(self):
+        """Nothing to load; present for API compatibility."""
+
+    def configure_model(self, duration=None):
+        """
+        Configure the duration of generated clips.
+
+        Args:
+            duration (int, optional): Duration in seconds. If None, uses instance duration.
+        """
+        self.configured_duration = duration or self.duration
+
+    def generate_music(self, prompt):
+        """
+        Simulate generation by sleeping and returning silence.
+
+        Args:
+            prompt (str): Text description of the music to generate
+
+        Returns:
+            tuple: (audio_data, sampling_rate)
+        """
+        latency = self.base_latency + self.seconds_per_audio_second * self.configured_duration
+        latency *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(latency, 0))
+
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("Simulated generation failure")
+
+        num_samples = int(self.configured_duration * self.sampling_rate)
+        return np.zeros((1, num_samples), dtype=np.float32), self.sampling_rate
+
+
+class InProcessTarget:
+    """Drive a MusicGenerator (or stub) directly in this process."""
+
+    def __init__(self, generator):
+        """
+        Initialize the target.
+
+        Args:
+            generator: Loaded MusicGenerator or StubMusicGenerator
+        """
+        self.generator = generator
+        self.lock = threading.Lock()
+        self.current_duration = None
+
+    def __call__(self, request, on_start=None):
+        """
+        Serve one request.
+
+        The generator holds a single model, so calls are serialized. Service
+        starts once the model lock is acquired; time spent waiting for it is
+        reported as queue time via on_start.
+
+        Args:
+            request (dict): Request with 'prompt' and 'duration' keys
+            on_start (callable, optional): Called when service actually starts
+        """
+        with self.lock:
+            if on_start is not None:
+                on_start()
+            if request['duration'] != self.current_duration:
+                self.generator.configure_model(duration=request['duration'])
+                self.current_duration = request['duration']
+            self.generator.generate_music(request['prompt'])
+
+
+class HttpTarget:
+    """Drive a generation service over a local HTTP endpoint."""
+
+    def __init__(self, url, timeout=300):
+        """
+        Initialize the target.
+
+        Args:
+            url (str): Endpoint accepting a JSON body with 'prompt' and 'duration'
+            timeout (float): Request timeout in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, request, on_start=None):
+        """
+        Serve one request by POSTing it to the endpoint.
+
+        Queueing inside the service is not visible from here, so service
+        time covers the whole HTTP round trip.
+
+        Args:
+            request (dict): Request with 'prompt' and 'duration' keys
+            on_start (callable, optional): Called when the request is sent
+        """
+        if on_start is not None:
+            on_start()
+        body = json.dumps({'prompt': request['prompt'],
+                           'duration': request['duration']}).encode('utf-8')
+        http_request = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+            response.read()
+
+
+def synthetic_trace(num_requests=100, rate=1.0, prompts=None, durations=None,
+                    burst_probability=0.1, burst_size=5, seed=None):
+    """
+    Build a synthetic request trace with Poisson arrivals and bursts.
+
+    Args:
+        num_requests (int): Number of requests in the trace
+        rate (float): Mean arrival rate in requests per second
+        prompts (list, optional): Prompts to sample from
+        durations (list, optional): Clip durations in seconds to sample from
+        burst_probability (float): Probability that an arrival starts a burst
+        burst_size (int): Number of simultaneous requests in a burst
+        seed (int, optional): Seed for reproducible traces
+
+    Returns:
+        list: Requests as dicts with 'arrival', 'prompt' and 'duration' keys
+    """
+    rng = random.Random(seed)
+    prompts = prompts or DEFAULT_PROMPTS
+    durations = durations or DEFAULT_DURATIONS
+
+    trace = []
+    arrival = 0.0
+    while len(trace) < num_requests:
+        arrival += rng.expovariate(rate)
+        count = burst_size if rng.random() < burst_probability else 1
+        for _ in range(min(count, num_requests - len(trace))):
+            trace.append({
+                'arrival': arrival,
+                'prompt': rng.choice(prompts),
+                'duration': rng.choice(durations),
+            })
+
+    return trace
+
+
+def load_trace(filename):
+    """
+    Load a recorded trace from a JSON lines file.
+
+    Args:
+        filename (str): File with one request per line
+
+    Returns:
+        list: Requests sorted by arrival time
+    """
+    with open(filename, 'r', encoding='utf-8') as fh:
+        trace = [json.loads(line) for line in fh if line.strip()]
+    return sorted(trace, key=lambda request: request['arrival'])
+
+
+def save_trace(trace, filename):
+    """
+    Save a trace to a JSON lines file.
+
+    Args:
+        trace (list): Requests to save
+        filename (str): Output filename
+    """
+    with open(filename, 'w', encoding='utf-8') as fh:
+        for request in trace:
+            fh.write(json.dumps(request) + "\n")
+    print(f"Trace saved to: {filename}")
+
+
+class LoadTester:
+    """Replay a request trace against a target and collect timings."""
+
+    def __init__(self, target, concurrency=1, time_scale=1.0):
+        """
+        Initialize the load tester.
+
+        Args:
+            target: Callable serving one request dict (e.g. InProcessTarget).
+                It receives an on_start callback to call when service
+                actually begins, so waits inside the target count as
+                queue time.
+            concurrency (int): Number of worker threads issuing requests
+            time_scale (float): Factor applied to arrival times; values below
+                1 replay the trace faster than recorded
+        """
+        self.target = target
+        self.concurrency = concurrency
+        self.time_scale = time_scale
+
+    def run(self, trace):
+        """
+        Replay a trace and return the collected report.
+
+        Args:
+            trace (list): Requests with 'arrival', 'prompt' and 'duration' keys
+
+        Returns:
+            LoadTestReport: Timings for every request
+        """
+        pending = queue.Queue()
+        results = []
+        results_lock = threading.Lock()
+
+        def worker():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                request, queued_at = item
+                timing = {}
+
+                def on_start():
+                    timing['started_at'] = time.perf_counter()
+
+                error = None
+                try:
+                    self.target(request, on_start)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                finished_at = time.perf_counter()
+                # Targets that fail before starting service spent the
+                # whole time queued
+                started_at = timing.get('started_at', finished_at)
+                with results_lock:
+                    results.append({
+                        'prompt': request['prompt'],
+                        'duration': request['duration'],
+                        'queued_at': queued_at,
+                        'started_at': started_at,
+                        'finished_at': finished_at,
+                        'error': error,
+                    })
+
+        workers = [threading.Thread(target=worker, daemon=True)
+                   for _ in range(self.concurrency)]
+        for thread in workers:
+            thread.start()
+
+        print(f"Replaying {len(trace)} requests with {self.concurrency} worker(s)...")
+        start = time.perf_counter()
+        for request in sorted(trace, key=lambda request: request['arrival']):
+            delay = start + request['arrival'] * self.time_scale - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pending.put((request, time.perf_counter()))
+
+        for _ in workers:
+            pending.put(None)
+        for thread in workers:
+            thread.join()
+
+        return LoadTestReport(results, time.perf_counter() - start)
+
+
+class LoadTestReport:
+    """Summary statistics for a load test run."""
+
+    def __init__(self, results, wall_time):
+        """
+        Initialize the report.
+
+        Args:
+            results (list): Per-request timing dicts from LoadTester
+            wall_time (float): Total duration of the run in seconds
+        """
+        self.results = results
+        self.wall_time = wall_time
+
+        self.queue_times = np.array([r['started_at'] - r['queued_at'] for r in results])
+        self.service_times = np.array([r['finished_at'] - r['started_at'] for r in results])
+        self.latencies = self.queue_times + self.service_times
+        self.errors = [r for r in results if r['error'] is not None]
+
+    def summary(self):
+        """
+        Compute the headline metrics.
+
+        Returns:
+            dict: Latency percentiles, throughput, queue time and error rate
+        """
+        num_requests = len(self.results)
+        if num_requests == 0:
+            return {'requests': 0}
+
+        ok = num_requests - len(self.errors)
+        p50, p95, p99 = np.percentile(self.latencies, [50, 95, 99])
+        return {
+            'requests': num_requests,
+            'errors': len(self.errors),
+            'error_rate': len(self.errors) / num_requests,
+            'throughput': ok / self.wall_time if self.wall_time > 0 else 0.0,
+            'latency_p50': float(p50),
+            'latency_p95': float(p95),
+            'latency_p99': float(p99),
+            'queue_time_mean': float(np.mean(self.queue_times)),
+            'queue_time_p95': float(np.percentile(self.queue_times, 95)),
+            'service_time_mean': float(np.mean(self.service_times)),
+            'wall_time': self.wall_time,
+        }
+
+    def print_summary(self):
+        """Print the headline metrics."""
+        stats = self.summary()
+        print("\n" + "=" * 50)
+        print("LOAD TEST REPORT")
+        print("=" * 50)
+        if stats['requests'] == 0:
+            print("No requests were replayed.")
+            return
+
+        print(f"Requests:        {stats['requests']} ({stats['errors']} errors, "
+              f"{stats['error_rate']:.1%})")
+        print(f"Throughput:      {stats['throughput']:.2f} req/s over {stats['wall_time']:.1f}s")
+        print(f"Latency p50:     {stats['latency_p50']:.3f}s")
+        print(f"Latency p95:     {stats['latency_p95']:.3f}s")
+        print(f"Latency p99:     {stats['latency_p99']:.3f}s")
+        print(f"Queue time mean: {stats['queue_time_mean']:.3f}s "
+              f"(p95 {stats['queue_time_p95']:.3f}s)")
+        print(f"Service mean:    {stats['service_time_mean']:.3f}s")
+
+
+def main(argv=None):
+    """Replay a recorded or synthetic trace against the stub or an HTTP endpoint."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trace', nargs='?',
+                        help="JSON lines trace to replay (synthetic if omitted)")
+    parser.add_argument('--target', choices=['stub', 'http'], default='stub',
+                        help="Drive the offline stub in-process or an HTTP endpoint")
+    parser.add_argument('--url', default='http://localhost:8000/generate',
+                        help="Endpoint URL for the http target")
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help="Number of worker threads issuing requests")
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help="Factor applied to arrival times (<1 replays faster)")
+    parser.add_argument('--requests', type=int, default=50,
+                        help="Number of requests in the synthetic trace")
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help="Mean arrival rate of the synthetic trace (req/s)")
+    parser.add_argument('--failure-rate', type=float, default=0.02,
+                        help="Probability that a stub call fails")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Seed for the synthetic trace and the stub")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        trace = synthetic_trace(num_requests=args.requests, rate=args.rate, seed=args.seed)
+
+    if args.target == 'http':
+        target = HttpTarget(args.url)
+    else:
+        generator = StubMusicGenerator(failure_rate=args.failure_rate, seed=args.seed)
+        target = InProcessTarget(generator)
+
+    tester = LoadTester(target, concurrency=args.concurrency, time_scale=args.time_scale)
+    report = tester.run(trace)
+    report.print_summary()
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Melody Conditioning Feature Cache
+This module caches reference melodies and their chroma conditioning features
+so many prompts can be applied to the same melody without recomputing them.
+"""
+
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import torch
+import torchaudio
+from audiocraft.data.audio_utils import convert_audio
+
+
+def file_hash(filename, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 hash of a file's content.
+
+    Args:
+        filename (str): Path of the file to hash
+        chunk_size (int): Number of bytes read at a time
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def waveform_hash(wav):
+    """
+    Compute the SHA-256 hash of a waveform tensor's samples.
+
+    Args:
+        wav: Audio tensor
+
+    Returns:
+        str: Hex digest of the samples
+    """
+    samples = wav.detach().to('cpu', torch.float32).contiguous().numpy()
+    return hashlib.sha256(samples.tobytes()).hexdigest()
+
+
+class MelodyFeatureCache:
+    """Cache of decoded melodies and chroma features keyed by content hash."""
+
+    def __init__(self, sample_rate, audio_channels=1, max_entries=64):
+        """
+        Initialize the cache.
+
+        Args:
+            sample_rate (int): Sample rate of the model melodies are prepared for
+            audio_channels (int): Number of channels the model expects
+            max_entries (int): Maximum number of melodies and feature sets kept
+        """
+        self.sample_rate = sample_rate
+        self.audio_channels = audio_channels
+        self.max_entries = max_entries
+        self.melodies = OrderedDict()
+        self.features = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load_melody(self, filename):
+        """
+        Load a reference melody, converted to the model's rate and channels.
+
+        Args:
+            filename (str): Path of the reference audio file
+
+        Returns:
+            torch.Tensor: Melody waveform of shape (channels, samples)
+        """
+        key = file_hash(filename)
+        if key in self.melodies:
+            self.melodies.move_to_end(key)
+            return self.melodies[key]
+
+        wav, sample_rate = torchaudio.load(filename)
+        wav = convert_audio(wav, sample_rate, self.sample_rate, self.audio_channels)
+        self._store(self.melodies, key, wav)
+        return wav
+
+    def compute_features(self, compute_fn, wav, sample_rate):
+        """
+        Return chroma features for a batch, computing only unseen rows.
+
+        Uncached rows are deduplicated and computed in a single batched call;
+        rows seen before (including the silent rows used for classifier-free
+        guidance) are served from the cache.
+
+        Args:
+            compute_fn: Function mapping (wav, sample_rate) to features (B, T, D)
+            wav: Batch of waveforms of shape (B, channels, samples)
+            sample_rate (int): Sample rate of the batch
+
+        Returns:
+            torch.Tensor: Features of shape (B, T, D)
+        """
+        keys = [waveform_hash(row) for row in wav]
+
+        missing = OrderedDict()
+        for index, key in enumerate(keys):
+            if key in self.features:
+                self.hits += 1
+            elif key not in missing:
+                missing[key] = index
+                self.misses += 1
+
+        computed = {}
+        if missing:
+            features = compute_fn(wav[list(missing.values())], sample_rate)
+            for row, key in enumerate(missing):
+                computed[key] = features[row]
+
+        rows = []
+        for key in keys:
+            if key in computed:
+                rows.append(computed[key])
+            else:
+                self.features.move_to_end(key)
+                rows.append(self.features[key].to(wav.device))
+
+        for key, row in computed.items():
+            self._store(self.features, key, row)
+
+        return torch.stack(rows)
+
+    def precompute(self, compute_fn, filenames, device=None):
+        """
+        Load several melodies and compute their features in batches.
+
+        Melodies of equal length are stacked and computed together so the
+        chroma extraction runs vectorized over the batch. They are downmixed
+        to mono first, as audiocraft does before computing the conditioning,
+        so the cached rows match those seen during generation.
+
+        Args:
+            compute_fn: Function mapping (wav, sample_rate) to features (B, T, D)
+            filenames (list): Paths of the reference audio files
+            device (optional): Device the features are computed on
+        """
+        by_length = OrderedDict()
+        for filename in filenames:
+            wav = self.load_melody(filename).mean(0, keepdim=True)
+            by_length.setdefault(wav.shape[-1], []).append(wav)
+
+        for wavs in by_length.values():
+            self.compute_features(compute_fn, torch.stack(wavs).to(device), self.sample_rate)
+
+    @contextmanager
+    def attached(self, conditioner):
+        """
+        Route a chroma conditioner's feature extraction through this cache.
+
+        The conditioner's private _compute_wav_embedding method is shadowed
+        on the instance only while the context is active.
+
+        Args:
+            conditioner: The model's melody (chroma) conditioner
+
+        Yields:
+            The conditioner's original feature extraction function
+        """
+        compute_fn = conditioner._compute_wav_embedding
+        conditioner._compute_wav_embedding = (
+            lambda wav, sample_rate: self.compute_features(compute_fn, wav, sample_rate)
+        )
+        try:
+            yield compute_fn
+        finally:
+            del conditioner._compute_wav_embedding
+
+    def clear(self):
+        """Remove all cached melodies and features."""
+        self.melodies.clear()
+        self.features.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, entries, key, value):
+        """Insert an entry, evicting the least recently used beyond capacity."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
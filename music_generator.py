@@ -9,23 +9,29 @@ from audiocraft.models import MusicGen
 from IPython.display import Audio
 import torch
 import numpy as np
+from melody_conditioning import MelodyFeatureCache
 
 
 class MusicGenerator:
     """A class to handle music generation using MusicGen AI model."""
     
-    def __init__(self, model_name='facebook/musicgen-small', duration=8):
+    def __init__(self, model_name='facebook/musicgen-small', duration=8,
+                 preview_duration=2):
         """
         Initialize the MusicGenerator.
         
         Args:
             model_name (str): The pretrained model to use
             duration (int): Duration of generated music in seconds
+            preview_duration (int): Duration of quick preview snippets in seconds
         """
         self.model_name = model_name
         self.duration = duration
+        self.preview_duration = preview_duration
+        self.configured_duration = duration
         self.model = None
         self.sampling_rate = None
+        self.melody_cache = None
         
     def load_model(self):
         """Load the pretrained MusicGen model."""
@@ -46,6 +52,7 @@ class MusicGenerator:
             
         duration = duration or self.duration
         self.model.set_generation_params(duration=duration)
+        self.configured_duration = duration
         print(f"Model configured with duration: {duration} seconds")
         
     def generate_music(self, prompt):
@@ -67,6 +74,152 @@ class MusicGenerator:
         
         return audio_data, self.sampling_rate
         
+    def generate_preview(self, prompt, duration=None):
+        """
+        Generate a short preview snippet for quick auditioning.
+        
+        Generation time grows with clip length, so a short preview lets a
+        prompt be rejected before paying for the full render. Sampling
+        settings are the same as for the full render, so render_full()
+        continues the preview in the same style. The model's configured
+        duration is restored afterwards.
+        
+        Args:
+            prompt (str): Text description of the music to generate
+            duration (int, optional): Preview duration in seconds. Uses
+                preview_duration if None.
+            
+        Returns:
+            tuple: (audio_data, sampling_rate)
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+            
+        duration = duration or self.preview_duration
+        print(f"Generating {duration}s preview for prompt: '{prompt}'")
+        self.model.set_generation_params(duration=duration)
+        try:
+            results = self.model.generate([prompt])
+        finally:
+            self.model.set_generation_params(duration=self.configured_duration)
+        audio_data = results[0].numpy()
+        
+        return audio_data, self.sampling_rate
+        
+    def render_full(self, preview_audio, prompt, duration=None):
+        """
+        Render the full clip by continuing from a preview snippet.
+        
+        The preview is used as the audio prompt, so the full render keeps
+        what was auditioned and only generates the remaining seconds.
+        
+        Args:
+            preview_audio: Preview audio data as numpy array (channels, samples)
+            prompt (str): Text description used for the preview
+            duration (int, optional): Total duration in seconds. Uses the
+                configured duration if None.
+            
+        Returns:
+            tuple: (audio_data, sampling_rate)
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+            
+        duration = duration or self.configured_duration
+        preview_seconds = preview_audio.shape[-1] / self.sampling_rate
+        if duration <= preview_seconds:
+            raise ValueError(
+                f"Full duration ({duration}s) must be longer than the "
+                f"preview ({preview_seconds:.1f}s)."
+            )
+            
+        print(f"Rendering full {duration}s clip from preview: '{prompt}'")
+        prompt_tensor = torch.from_numpy(preview_audio)[None]
+        self.model.set_generation_params(duration=duration)
+        try:
+            results = self.model.generate_continuation(
+                prompt_tensor, self.sampling_rate, [prompt]
+            )
+        finally:
+            self.model.set_generation_params(duration=self.configured_duration)
+        audio_data = results[0].numpy()
+        
+        return audio_data, self.sampling_rate
+        
+    def generate_with_melody(self, prompts, melody_file, batch_size=4):
+        """
+        Generate music for several prompts conditioned on a reference melody.
+        
+        The melody is decoded once and its chroma features are cached by
+        content hash, so further prompts applied to the same file reuse them.
+        Requires a melody model such as 'facebook/musicgen-melody'.
+        
+        Args:
+            prompts (list): Text descriptions of the music to generate
+            melody_file (str): Path of the reference audio file
+            batch_size (int): Number of prompts generated per model call
+            
+        Returns:
+            tuple: (list of audio_data arrays, sampling_rate)
+        """
+        if isinstance(prompts, str):
+            prompts = [prompts]
+            
+        cache, conditioner = self._melody_feature_cache()
+        melody = cache.load_melody(melody_file)
+        
+        audio_list = []
+        with cache.attached(conditioner):
+            for start in range(0, len(prompts), batch_size):
+                batch = prompts[start:start + batch_size]
+                print(f"Generating {len(batch)} melody-conditioned clip(s) from: '{melody_file}'")
+                melody_wavs = melody[None].expand(len(batch), -1, -1)
+                results = self.model.generate_with_chroma(batch, melody_wavs, self.sampling_rate)
+                audio_list.extend(result.cpu().numpy() for result in results)
+                
+        return audio_list, self.sampling_rate
+        
+    def precompute_melody_features(self, melody_files):
+        """
+        Compute and cache chroma features for several reference melodies.
+        
+        Args:
+            melody_files (list): Paths of the reference audio files
+        """
+        cache, conditioner = self._melody_feature_cache()
+        with torch.no_grad():
+            cache.precompute(conditioner._compute_wav_embedding, melody_files,
+                             device=self.model.device)
+        print(f"Cached melody features for {len(melody_files)} file(s)")
+        
+    def _melody_feature_cache(self):
+        """
+        Return the melody feature cache and the model's chroma conditioner.
+        
+        The cache hooks into ChromaStemConditioner._compute_wav_embedding, a
+        private audiocraft method that older releases do not provide.
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+            
+        conditioners = self.model.lm.condition_provider.conditioners
+        if 'self_wav' not in conditioners:
+            raise ValueError(
+                f"Model '{self.model_name}' does not support melody conditioning. "
+                "Use 'facebook/musicgen-melody'."
+            )
+        conditioner = conditioners['self_wav']
+        if not hasattr(conditioner, '_compute_wav_embedding'):
+            raise ValueError(
+                f"The installed audiocraft version ({audiocraft.__version__}) does not "
+                f"provide {type(conditioner).__name__}._compute_wav_embedding, which "
+                "the melody feature cache relies on. Upgrade audiocraft."
+            )
+            
+        if self.melody_cache is None:
+            self.melody_cache = MelodyFeatureCache(self.sampling_rate, self.model.audio_channels)
+        return self.melody_cache, conditioner
+        
     def save_audio(self, audio_data, filename, sampling_rate=None):
         """
         Save generated audio to file.
@@ -0,0 +1,202 @@
+"""
+Session History for Music Generation
+This module keeps a bounded, compact in-memory history of generated clips.
+"""
+
+import os
+import shutil
+import tempfile
+import datetime
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import torch
+import torchaudio
+
+
+INT16_SCALE = 32767
+
+
+def to_int16(audio_data):
+    """
+    Quantize float audio in [-1, 1] to int16.
+
+    Args:
+        audio_data: Float audio data as numpy array
+
+    Returns:
+        np.ndarray: int16 samples
+    """
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    return np.round(np.clip(audio_data, -1.0, 1.0) * INT16_SCALE).astype(np.int16)
+
+
+class HistoryEntry:
+    """A single generated take stored in the session history."""
+
+    def __init__(self, take_id, prompt, sampling_rate, samples, label='full'):
+        """
+        Initialize the entry.
+
+        Args:
+            take_id (int): Sequential id of the take within the session
+            prompt (str): Prompt used to generate the take
+            sampling_rate (int): Sampling rate of the audio
+            samples: Audio data as int16 numpy array (channels, samples)
+            label (str): Kind of take, e.g. 'full' or 'preview'
+        """
+        self.take_id = take_id
+        self.prompt = prompt
+        self.sampling_rate = sampling_rate
+        self.label = label
+        self.created_at = datetime.datetime.now()
+        self.shape = samples.shape
+        self.samples = samples
+        self.spill_path = None
+
+    @property
+    def in_memory(self):
+        """Whether the samples are held in RAM rather than spilled to disk."""
+        return self.samples is not None
+
+    @property
+    def duration(self):
+        """Duration of the take in seconds."""
+        return self.shape[-1] / self.sampling_rate
+
+    def describe(self):
+        """Return a short human-readable description of the take."""
+        location = "" if self.in_memory else " [disk]"
+        return (f"#{self.take_id} {self.label} {self.duration:.1f}s "
+                f"({self.created_at:%H:%M:%S}) '{self.prompt}'{location}")
+
+
+class SessionHistory:
+    """Bounded history of generated clips stored as int16 in RAM."""
+
+    def __init__(self, max_memory_mb=256, spill_dir=None):
+        """
+        Initialize the history.
+
+        Args:
+            max_memory_mb (float): Memory budget for in-RAM samples in megabytes
+            spill_dir (str, optional): Directory for takes evicted from RAM.
+                A temporary directory is created on first spill if None and
+                removed by clear(), on garbage collection or at exit.
+        """
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        self._cleanup = None
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, audio_data, sampling_rate, prompt, label='full'):
+        """
+        Add a generated clip to the history.
+
+        Args:
+            audio_data: Float audio data as numpy array in [-1, 1]
+            sampling_rate (int): Sampling rate of the audio
+            prompt (str): Prompt used to generate the clip
+            label (str): Kind of take, e.g. 'full' or 'preview'
+
+        Returns:
+            int: Id of the stored take
+        """
+        samples = to_int16(audio_data)
+        entry = HistoryEntry(self._next_id, prompt, sampling_rate, samples, label)
+        self._next_id += 1
+
+        self.entries[entry.take_id] = entry
+        self.memory_bytes += samples.nbytes
+        self._enforce_budget()
+
+        return entry.take_id
+
+    def get(self, take_id):
+        """
+        Get the audio of a take as float32.
+
+        Args:
+            take_id (int): Id of the take
+
+        Returns:
+            tuple: (audio_data, sampling_rate)
+        """
+        entry = self._entry(take_id)
+        if entry.in_memory:
+            samples = entry.samples
+        else:
+            samples = np.load(entry.spill_path)
+        return self._to_float32(samples), entry.sampling_rate
+
+    def export(self, take_id, filename):
+        """
+        Save a take to a WAV file.
+
+        Args:
+            take_id (int): Id of the take
+            filename (str): Output filename
+        """
+        entry = self._entry(take_id)
+        samples = entry.samples if entry.in_memory else np.load(entry.spill_path)
+        torchaudio.save(filename, torch.from_numpy(samples), entry.sampling_rate)
+        print(f"Take #{take_id} exported to: {filename}")
+
+    def describe(self):
+        """Return (description, take_id) pairs, newest first."""
+        return [(entry.describe(), take_id)
+                for take_id, entry in reversed(self.entries.items())]
+
+    def clear(self):
+        """Remove all takes, including any spilled to disk."""
+        for entry in self.entries.values():
+            if entry.spill_path and os.path.exists(entry.spill_path):
+                os.remove(entry.spill_path)
+        self.entries.clear()
+        self.memory_bytes = 0
+
+        if self._cleanup is not None:
+            self._cleanup()
+            self._cleanup = None
+            self.spill_dir = None
+
+    def _entry(self, take_id):
+        """Look up a take, raising a helpful error if it does not exist."""
+        if take_id not in self.entries:
+            raise KeyError(f"No take #{take_id} in session history.")
+        return self.entries[take_id]
+
+    def _enforce_budget(self):
+        """Spill the oldest in-RAM takes to disk until within budget."""
+        for entry in self.entries.values():
+            if self.memory_bytes <= self.max_memory_bytes:
+                break
+            if entry.in_memory:
+                self._spill(entry)
+
+    def _spill(self, entry):
+        """Write a take's samples to disk and release them from RAM."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="music_history_")
+            # Remove the temporary directory when the history is garbage
+            # collected or the interpreter exits
+            self._cleanup = weakref.finalize(
+                self, shutil.rmtree, self.spill_dir, ignore_errors=True
+            )
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        entry.spill_path = os.path.join(self.spill_dir, f"take_{entry.take_id}.npy")
+        np.save(entry.spill_path, entry.samples)
+        self.memory_bytes -= entry.samples.nbytes
+        entry.samples = None
+
+    @staticmethod
+    def _to_float32(samples):
+        """Convert int16 samples back to float32 audio in [-1, 1]."""
+        return samples.astype(np.float32) / INT16_SCALE
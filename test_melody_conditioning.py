@@ -0,0 +1,121 @@
+"""
+Tests for the melody feature cache, run with a fake chroma conditioner.
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchaudio")
+pytest.importorskip("audiocraft")
+
+from torch import nn
+
+from melody_conditioning import MelodyFeatureCache
+from music_generator import MusicGenerator
+
+
+class CountingConditioner(nn.Module):
+    """Stand-in for ChromaStemConditioner that counts computed rows."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def _compute_wav_embedding(self, wav, sample_rate):
+        self.calls.append(wav.shape[0])
+        return wav.sum(dim=1)[:, :8, None]
+
+
+class FakeModel:
+    """Minimal model exposing audiocraft's conditioner layout."""
+
+    def __init__(self, conditioners):
+        self.lm = nn.Module()
+        self.lm.condition_provider = nn.Module()
+        self.lm.condition_provider.conditioners = nn.ModuleDict(conditioners)
+        self.audio_channels = 1
+
+
+def make_generator(conditioners):
+    generator = MusicGenerator(model_name='facebook/musicgen-melody')
+    generator.model = FakeModel(conditioners)
+    generator.sampling_rate = 32000
+    return generator
+
+
+def test_cached_rows_are_not_recomputed():
+    """Rows seen in an earlier batch are served from the cache."""
+    conditioner = CountingConditioner()
+    cache = MelodyFeatureCache(sample_rate=32000)
+    wav = torch.randn(2, 1, 64)
+
+    first = cache.compute_features(conditioner._compute_wav_embedding, wav, 32000)
+    second = cache.compute_features(conditioner._compute_wav_embedding, wav, 32000)
+
+    assert conditioner.calls == [2]
+    assert torch.equal(first, second)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_duplicate_rows_in_batch_are_computed_once():
+    """Identical rows in one batch are computed in a single row."""
+    conditioner = CountingConditioner()
+    cache = MelodyFeatureCache(sample_rate=32000)
+    wav = torch.randn(1, 1, 64).expand(3, -1, -1)
+
+    features = cache.compute_features(conditioner._compute_wav_embedding, wav, 32000)
+
+    assert conditioner.calls == [1]
+    assert features.shape == (3, 8, 1)
+    assert cache.misses == 1
+
+
+def test_attached_restores_original_method():
+    """The conditioner's own method is used again after the context exits."""
+    conditioner = CountingConditioner()
+    cache = MelodyFeatureCache(sample_rate=32000)
+    wav = torch.randn(2, 1, 64)
+
+    with cache.attached(conditioner) as compute_fn:
+        conditioner._compute_wav_embedding(wav, 32000)
+        conditioner._compute_wav_embedding(wav, 32000)
+        assert compute_fn.__func__ is CountingConditioner._compute_wav_embedding
+
+    assert '_compute_wav_embedding' not in vars(conditioner)
+    assert conditioner.calls == [2]
+    conditioner._compute_wav_embedding(wav, 32000)
+    assert conditioner.calls == [2, 2]
+
+
+def test_precompute_matches_mono_rows_seen_during_generation(monkeypatch):
+    """Stereo melodies are precomputed as the mono rows audiocraft passes in."""
+    conditioner = CountingConditioner()
+    cache = MelodyFeatureCache(sample_rate=32000, audio_channels=2)
+    stereo = torch.randn(2, 64)
+    monkeypatch.setattr(cache, 'load_melody', lambda filename: stereo)
+
+    cache.precompute(conditioner._compute_wav_embedding, ['melody.wav'])
+    mono_batch = stereo.mean(0, keepdim=True)[None].expand(2, -1, -1)
+    cache.compute_features(conditioner._compute_wav_embedding, mono_batch, 32000)
+
+    assert conditioner.calls == [1]
+    assert cache.hits == 2
+
+
+def test_melody_feature_cache_finds_conditioner_in_module_dict():
+    """The melody conditioner is looked up in audiocraft's ModuleDict."""
+    conditioner = CountingConditioner()
+    generator = make_generator({'self_wav': conditioner})
+
+    cache, found = generator._melody_feature_cache()
+
+    assert found is conditioner
+    assert isinstance(cache, MelodyFeatureCache)
+
+
+def test_melody_feature_cache_rejects_text_only_model():
+    """Models without a melody conditioner raise a helpful error."""
+    generator = make_generator({})
+
+    with pytest.raises(ValueError, match="does not support melody conditioning"):
+        generator._melody_feature_cache()
@@ -0,0 +1,230 @@
+"""
+Waveform and Spectrogram Visualization
+This module renders cached waveform/spectrogram thumbnails for generated clips.
+"""
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from session_history import to_int16
+
+
+def clip_hash(audio_data):
+    """
+    Compute a content hash for a clip.
+
+    Samples are quantized to int16 the same way the session history stores
+    them, so a clip and its copy restored from the history hash to the same
+    key.
+
+    Args:
+        audio_data: Audio data as numpy array in [-1, 1]
+
+    Returns:
+        str: Hex digest of the clip
+    """
+    samples = to_int16(audio_data)
+    digest = hashlib.sha256(str(samples.shape).encode('utf-8'))
+    digest.update(samples.tobytes())
+    return digest.hexdigest()
+
+
+def _to_mono_batch(audio_batch):
+    """Convert (samples,), (channels, samples) or (B, channels, samples) to (B, samples)."""
+    audio_batch = np.asarray(audio_batch, dtype=np.float32)
+    if audio_batch.ndim == 1:
+        return audio_batch[None]
+    if audio_batch.ndim == 2:
+        return audio_batch.mean(axis=0)[None]
+    return audio_batch.mean(axis=1)
+
+
+def waveform_envelope(audio_batch, num_bins=400):
+    """
+    Compute downsampled min/max waveform envelopes.
+
+    Args:
+        audio_batch: Audio as (samples,), (channels, samples) or
+            (batch, channels, samples) numpy array
+        num_bins (int): Number of envelope points per clip
+
+    Returns:
+        tuple: (minima, maxima) arrays of shape (batch, num_bins)
+    """
+    mono = _to_mono_batch(audio_batch)
+    num_samples = mono.shape[-1]
+    num_bins = max(1, min(num_bins, num_samples))
+
+    # Spread the samples evenly over the bins; widths differ by at most one
+    starts = np.linspace(0, num_samples, num_bins + 1).astype(int)[:-1]
+    return (np.minimum.reduceat(mono, starts, axis=-1),
+            np.maximum.reduceat(mono, starts, axis=-1))
+
+
+def spectrogram(audio_batch, n_fft=1024, hop_length=512, max_frames=400):
+    """
+    Compute log-magnitude STFT spectrograms.
+
+    Args:
+        audio_batch: Audio as (samples,), (channels, samples) or
+            (batch, channels, samples) numpy array
+        n_fft (int): FFT window size
+        hop_length (int): Number of samples between frames
+        max_frames (int): Upper bound on frames; the hop is widened for long clips
+
+    Returns:
+        np.ndarray: Spectrograms in dB of shape (batch, n_fft // 2 + 1, frames)
+    """
+    mono = _to_mono_batch(audio_batch)
+    if mono.shape[-1] < n_fft:
+        mono = np.pad(mono, ((0, 0), (0, n_fft - mono.shape[-1])))
+
+    hop_length = max(hop_length, -(-(mono.shape[-1] - n_fft + 1) // max_frames))
+    frames = np.lib.stride_tricks.sliding_window_view(mono, n_fft, axis=-1)[:, ::hop_length]
+    magnitudes = np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=-1))
+    decibels = 20 * np.log10(np.maximum(magnitudes, 1e-6))
+
+    return decibels.transpose(0, 2, 1)
+
+
+class ThumbnailRenderer:
+    """Render waveform/spectrogram thumbnails off the main thread with caching."""
+
+    def __init__(self, max_entries=256, num_workers=1, width=4.0, height=2.0, dpi=80):
+        """
+        Initialize the renderer.
+
+        Args:
+            max_entries (int): Maximum number of thumbnails kept in the cache
+            num_workers (int): Number of background rendering threads
+            width (float): Thumbnail width in inches
+            height (float): Thumbnail height in inches
+            dpi (int): Thumbnail resolution
+        """
+        self.max_entries = max_entries
+        self.figsize = (width, height)
+        self.dpi = dpi
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+
+    def render(self, audio_data, sampling_rate):
+        """
+        Render a thumbnail for a clip, using the cache when possible.
+
+        Args:
+            audio_data: Audio data as numpy array
+            sampling_rate (int): Sampling rate of the audio
+
+        Returns:
+            bytes: PNG image data
+        """
+        return self.render_batch([audio_data], sampling_rate)[0]
+
+    def render_batch(self, clips, sampling_rate):
+        """
+        Render thumbnails for several clips.
+
+        Envelopes and spectrograms for uncached clips of equal shape are
+        computed together in one vectorized pass.
+
+        Args:
+            clips (list): Audio data arrays
+            sampling_rate (int): Sampling rate of the audio
+
+        Returns:
+            list: PNG image data for each clip, in order
+        """
+        keys = [clip_hash(audio_data) for audio_data in clips]
+
+        images = {}
+        by_shape = OrderedDict()
+        with self.lock:
+            for key, audio_data in zip(keys, clips):
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    images[key] = self.cache[key]
+                else:
+                    by_shape.setdefault(np.shape(audio_data), {})[key] = audio_data
+
+        for group in by_shape.values():
+            batch = np.stack([np.asarray(audio_data, dtype=np.float32)
+                              for audio_data in group.values()])
+            if batch.ndim == 2:
+                batch = batch[:, None]
+            minima, maxima = waveform_envelope(batch)
+            spectrograms = spectrogram(batch)
+            duration = batch.shape[-1] / sampling_rate
+
+            for i, key in enumerate(group):
+                images[key] = self._draw(minima[i], maxima[i], spectrograms[i],
+                                         duration, sampling_rate)
+                self._store(key, images[key])
+
+        return [images[key] for key in keys]
+
+    def submit(self, audio_data, sampling_rate):
+        """
+        Render a thumbnail in the background.
+
+        Args:
+            audio_data: Audio data as numpy array
+            sampling_rate (int): Sampling rate of the audio
+
+        Returns:
+            concurrent.futures.Future: Resolves to PNG image data
+        """
+        return self.executor.submit(self.render, audio_data, sampling_rate)
+
+    def save_thumbnail(self, audio_data, sampling_rate, filename):
+        """
+        Render a thumbnail and save it as a PNG file.
+
+        Args:
+            audio_data: Audio data as numpy array
+            sampling_rate (int): Sampling rate of the audio
+            filename (str): Output filename
+        """
+        with open(filename, 'wb') as fh:
+            fh.write(self.render(audio_data, sampling_rate))
+        print(f"Thumbnail saved to: {filename}")
+
+    def _draw(self, minima, maxima, decibels, duration, sampling_rate):
+        """Draw one envelope and spectrogram thumbnail and return PNG bytes."""
+        # Figure with an Agg canvas avoids pyplot's global state, so this is
+        # safe to call from worker threads.
+        figure = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(figure)
+        wave_axes, spec_axes = figure.subplots(2, 1, sharex=True)
+
+        times = np.linspace(0, duration, len(minima))
+        wave_axes.fill_between(times, minima, maxima, color='tab:blue', linewidth=0)
+        wave_axes.set_ylim(-1, 1)
+        wave_axes.set_axis_off()
+
+        spec_axes.imshow(
+            decibels, origin='lower', aspect='auto', cmap='magma',
+            extent=(0, duration, 0, sampling_rate / 2),
+            vmin=decibels.max() - 80, vmax=decibels.max()
+        )
+        spec_axes.set_axis_off()
+        figure.subplots_adjust(left=0, right=1, top=1, bottom=0, hspace=0.05)
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+    def _store(self, key, png):
+        """Insert a thumbnail, evicting the least recently used beyond capacity."""
+        with self.lock:
+            self.cache[key] = png
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)